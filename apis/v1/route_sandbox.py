@@ -1,16 +1,29 @@
 import asyncio
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 from uuid import uuid4
 from db.db_session import get_db
+from db.jobs import requeue_job, track_job, untrack_job
+from db.redis_session import get_redis_client
 from db.user import get_optional_current_user
-from schemas.code import CodeRequest, CodeStatus
+from schemas.code import (
+    CodeRequest,
+    CodeResult,
+    CodeStatus,
+    Language,
+    SubmissionHistory,
+    SubmissionState,
+    SubmissionSummary,
+)
 from pymongo.asynchronous.database import AsyncDatabase
 
 from db.sandbox import (
     check_quota,
     create_initial_submission,
     execute_code,
+    get_submission_history,
     get_visitor_id,
+    inflate_submission,
+    require_runner_image,
     update_submission_result,
 )
 
@@ -20,14 +33,58 @@ router = APIRouter()
 async def run_background_task(
     task_id: str, code_request: CodeRequest, db: AsyncDatabase
 ):
-    await db.submissions.update_one(
-        {"task_id": task_id}, {"$set": {"status": "running"}}
-    )
+    # Tracking only lets another worker take the job over after a shutdown or
+    # crash, so a Redis outage must not keep it from running
+    tracked = False
+    try:
+        redis = await get_redis_client()
+        await track_job(redis, task_id, code_request)
+        tracked = True
+    except Exception as e:
+        print(f"Could not track job {task_id}, running it untracked: {e!r}")
+
+    try:
+        await db.submissions.update_one(
+            {"task_id": task_id}, {"$set": {"status": "running"}}
+        )
+
+        result = await execute_code(code_request)
+
+        final_status = "timeout" if result.error_type == "timeout" else ("completed" if result.exit_code == 0 else "failed")
+        await update_submission_result(db, task_id, final_status, result)
+
+    except asyncio.CancelledError:
+        if not tracked:
+            # No other worker knows about this job, so record why it stopped
+            result = CodeResult(
+                stderr="Execution was interrupted by a server shutdown. Please resubmit.",
+                exit_code=1,
+                error_type="system",
+            )
+            await update_submission_result(db, task_id, "failed", result)
+            raise
+
+        # The worker is shutting down past its drain timeout, let another one run
+        # it. requeue_job drops the in-flight entry itself; if this is cancelled
+        # again first, the entry stays and heartbeat reclaim recovers the job.
+        await db.submissions.update_one(
+            {"task_id": task_id}, {"$set": {"status": "pending"}}
+        )
+        await requeue_job(redis, task_id, code_request)
+        raise
+
+    # Only a stored result ends the job; untracking earlier could drop the one
+    # record that lets another worker recover it, or a new owner's entry
+    if tracked:
+        try:
+            await untrack_job(redis, task_id)
+        except Exception as e:
+            # The entry is reclaimed once this worker stops, and the job rerun
+            print(f"Could not untrack job {task_id}: {e!r}")
 
-    result = await execute_code(code_request)
 
-    final_status = "timeout" if result.error_type == "timeout" else ("completed" if result.exit_code == 0 else "failed")
-    await update_submission_result(db, task_id, final_status, result)
+async def run_requeued_task(task_id: str, code_request: CodeRequest):
+    await run_background_task(task_id, code_request, await get_db())
 
 
 @router.post("/", response_model=CodeStatus)
@@ -36,6 +93,7 @@ async def submit_code(
     background_tasks: BackgroundTasks,
     user=Depends(get_optional_current_user),
     visitor_id: str = Depends(get_visitor_id),
+    runner_image=Depends(require_runner_image),
     quota=Depends(check_quota),
     db: AsyncDatabase = Depends(get_db),
 ) -> CodeStatus:
@@ -52,14 +110,42 @@ async def submit_code(
 
 @router.get("/status/{task_id}", response_model=CodeStatus)
 async def get_status(task_id: str, db: AsyncDatabase = Depends(get_db)) -> CodeStatus:
-    submission = await db.submissions.find_one({"task_id": task_id})
+    submission = await db.submissions.find_one({"task_id": task_id}, {"code": 0})
 
     if not submission:
         raise HTTPException(status_code=404, detail="Task not found")
 
+    inflate_submission(submission)
+
     return CodeStatus(
         task_id=submission["task_id"],
         user_id=submission["user_id"],
         status=submission["status"],
         result=submission["result"],
     )
+
+
+@router.get("/history", response_model=SubmissionHistory)
+async def get_history(
+    visitor_id: str = Depends(get_visitor_id),
+    language: Language | None = None,
+    status: SubmissionState | None = None,
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    include_body: bool = False,
+    db: AsyncDatabase = Depends(get_db),
+) -> SubmissionHistory:
+    submissions, next_cursor = await get_submission_history(
+        db,
+        visitor_id,
+        limit,
+        cursor=cursor,
+        language=language,
+        state=status,
+        include_body=include_body,
+    )
+
+    return SubmissionHistory(
+        items=[SubmissionSummary(**submission) for submission in submissions],
+        next_cursor=next_cursor,
+    )
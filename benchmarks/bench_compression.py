@@ -0,0 +1,187 @@
+"""
+Storage savings and CPU cost of compressing submission bodies.
+
+Builds a reproducible corpus of submissions shaped like real traffic (short
+hello-world runs, competitive programming solutions with numeric output,
+chatty logs, tracebacks and compiler errors), then compares the BSON size of
+the stored documents with and without compression across thresholds and
+levels. Runs offline, no database needed.
+
+    python -m benchmarks.bench_compression --submissions 5000
+"""
+
+import argparse
+import random
+import time
+
+import bson
+from core.compression import compress_text, decompress_text
+
+
+HELLO = {
+    "python": 'print("Hello, World!")\nprint("I am learning Python.")',
+    "javascript": "console.log('Hello, World!'); console.log('I am learning JavaScript.');",
+    "java": 'public class Main { public static void main(String[] args) { System.out.println("Hello, World!"); } }',
+    "cpp": '#include <iostream>\n\nint main() {\n    std::cout << "Hello, World!" << std::endl;\n    return 0;\n}',
+}
+
+CPP_TEMPLATE = """#include <bits/stdc++.h>
+using namespace std;
+using ll = long long;
+
+{helpers}
+
+int main() {{
+    ios::sync_with_stdio(false);
+    cin.tie(nullptr);
+    int n = {n};
+    vector<ll> a(n);
+    for (int i = 0; i < n; i++) a[i] = (ll)i * {k} % 1000003;
+    sort(a.begin(), a.end());
+    for (int i = 0; i < n; i++) cout << solve(a[i]) << '\\n';
+    return 0;
+}}
+"""
+
+CPP_HELPER = """ll helper_{i}(ll x) {{
+    ll r = 0;
+    while (x > 0) {{ r += x % {m}; x /= {m}; }}
+    return r;
+}}
+"""
+
+PY_TRACEBACK = """Traceback (most recent call last):
+  File "/sandbox/main.py", line {line}, in <module>
+    main()
+  File "/sandbox/main.py", line {inner}, in main
+    value = data[{index}]
+IndexError: list index out of range
+"""
+
+GCC_ERROR = """main.cpp: In function 'int main()':
+main.cpp:{line}:{col}: error: '{name}' was not declared in this scope
+   {line} |     {name}(a, n);
+      |     ^~~~~~~~
+main.cpp:{line}:{col}: note: suggested alternative: 'min'
+"""
+
+
+def _code(rng: random.Random, language: str) -> str:
+    if language != "cpp" or rng.random() < 0.3:
+        return HELLO[language]
+    helpers = "\n".join(
+        CPP_HELPER.format(i=i, m=rng.randint(2, 97)) for i in range(rng.randint(1, 12))
+    )
+    helpers += "\nll solve(ll x) { return helper_0(x); }\n"
+    return CPP_TEMPLATE.format(helpers=helpers, n=rng.randint(10, 10**5), k=rng.randint(2, 999))
+
+
+def _stdout(rng: random.Random) -> str | None:
+    kind = rng.random()
+    if kind < 0.4:
+        return "Hello, World!\nI am learning.\n"
+    if kind < 0.7:
+        # numeric answers, one per line
+        return "\n".join(str(rng.randint(0, 10**9)) for _ in range(rng.randint(10, 20000))) + "\n"
+    if kind < 0.9:
+        # debug logging inside loops
+        lines = rng.randint(50, 5000)
+        return "".join(
+            f"iter={i} best={rng.randint(0, 10**6)} state=OK queue={rng.randint(0, 64)}\n"
+            for i in range(lines)
+        )
+    # grids and matrices
+    size = rng.randint(5, 200)
+    return "".join(
+        " ".join(rng.choice(".#") for _ in range(size)) + "\n" for _ in range(size)
+    )
+
+
+def _stderr(rng: random.Random) -> str | None:
+    kind = rng.random()
+    if kind < 0.8:
+        return None
+    if kind < 0.9:
+        return PY_TRACEBACK.format(line=rng.randint(5, 80), inner=rng.randint(2, 40), index=rng.randint(0, 99))
+    return "".join(
+        GCC_ERROR.format(line=rng.randint(5, 200), col=rng.randint(1, 40), name=f"helper{j}")
+        for j in range(rng.randint(1, 20))
+    )
+
+
+def build_corpus(size: int, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        language = rng.choice(list(HELLO))
+        corpus.append(
+            {
+                "code": _code(rng, language),
+                "stdout": _stdout(rng),
+                "stderr": _stderr(rng),
+            }
+        )
+    return corpus
+
+
+def _document(code, stdout, stderr) -> bytes:
+    return bson.encode(
+        {
+            "task_id": "00000000-0000-0000-0000-000000000000",
+            "user_id": "000000000000000000000000",
+            "language": "cpp",
+            "code": code,
+            "status": "completed",
+            "result": {"stdout": stdout, "stderr": stderr, "exit_code": 0},
+        }
+    )
+
+
+def measure(corpus: list[dict], threshold: int, level: int) -> dict:
+    raw_bytes = stored_bytes = 0
+    compress_seconds = decompress_seconds = 0.0
+    for submission in corpus:
+        raw_bytes += len(_document(**submission))
+
+        start = time.perf_counter()
+        stored = {
+            field: compress_text(value, threshold=threshold, level=level)
+            for field, value in submission.items()
+        }
+        compress_seconds += time.perf_counter() - start
+        stored_bytes += len(_document(**stored))
+
+        start = time.perf_counter()
+        for value in stored.values():
+            decompress_text(value)
+        decompress_seconds += time.perf_counter() - start
+
+    return {
+        "raw_mb": raw_bytes / 2**20,
+        "stored_mb": stored_bytes / 2**20,
+        "ratio": raw_bytes / stored_bytes,
+        "compress_us": compress_seconds / len(corpus) * 1e6,
+        "decompress_us": decompress_seconds / len(corpus) * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--submissions", type=int, default=5000)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.submissions)
+    for level in (1, 3, 6):
+        for threshold in (256, 512, 1024, 4096):
+            stats = measure(corpus, threshold, level)
+            print(
+                f"level={level} threshold={threshold:<5} "
+                f"raw={stats['raw_mb']:.1f}MB stored={stats['stored_mb']:.1f}MB "
+                f"ratio={stats['ratio']:.2f}x "
+                f"compress={stats['compress_us']:.0f}us/doc "
+                f"decompress={stats['decompress_us']:.0f}us/doc"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+End-to-end execution latency per language, measured through execute_code.
+
+Requires a reachable Docker daemon (DOCKER_HOST). Compare Java modes with e.g.
+
+    JAVA_EXEC_MODE=javac python -m benchmarks.bench_exec --language java
+    JAVA_EXEC_MODE=auto  python -m benchmarks.bench_exec --language java
+
+and C++ flag profiles with --profile fast / --profile judge.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from core.config import settings
+from db.runner_images import connect, prepare_runner_images
+from db.sandbox import execute_code
+from schemas.code import CodeRequest
+
+
+SAMPLES = {
+    "python": 'print("Hello, World!")',
+    "javascript": "console.log('Hello, World!');",
+    "java": 'public class Main { public static void main(String[] args) { System.out.println("Hello, World!"); } }',
+    "cpp": '#include <bits/stdc++.h>\nint main() { std::cout << "Hello, World!" << std::endl; return 0; }',
+}
+
+
+async def bench_language(language: str, runs: int, profile: str) -> dict:
+    request = CodeRequest(language=language, code=SAMPLES[language], profile=profile)
+
+    # First run pays image and page-cache warm-up, keep it out of the stats
+    await execute_code(request)
+
+    wall, compiled, reported = [], [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = await execute_code(request)
+        wall.append(time.perf_counter() - start)
+        if result.exit_code != 0:
+            raise RuntimeError(f"{language} sample failed: {result.stderr}")
+        if "[cds" in (result.stderr or ""):
+            # The JVM ran without the AppCDS archive, the numbers would not be representative
+            raise RuntimeError(f"CDS archive was rejected: {result.stderr}")
+        compiled.append(result.compile_time or 0.0)
+        reported.append(result.execution_time or 0.0)
+
+    return {
+        "language": language,
+        "runs": runs,
+        "wall_median": statistics.median(wall),
+        "wall_p90": sorted(wall)[int(0.9 * (runs - 1))],
+        "compile_median": statistics.median(compiled),
+        "exec_median": statistics.median(reported),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--language", choices=sorted(SAMPLES), action="append")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--profile", choices=["fast", "judge"], default="fast")
+    args = parser.parse_args()
+
+    await asyncio.to_thread(prepare_runner_images, connect(settings.DOCKER_HOST))
+
+    print(f"JAVA_EXEC_MODE={settings.JAVA_EXEC_MODE} JAVA_OPTS={settings.JAVA_OPTS!r}")
+    for language in args.language or sorted(SAMPLES):
+        stats = await bench_language(language, args.runs, args.profile)
+        print(
+            f"{stats['language']:<11} runs={stats['runs']:<3} "
+            f"wall median={stats['wall_median']:.3f}s p90={stats['wall_p90']:.3f}s "
+            f"compile median={stats['compile_median']:.3f}s "
+            f"exec median={stats['exec_median']:.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,113 @@
+"""
+Latency of GET /api/sandbox/history pages against a large submissions collection.
+
+Seeds a scratch database on DATABASE_URI (never the live "ideall" one), creates
+the startup indexes, then times deep keyset pagination and checks the winning
+plans never fall back to a collection scan.
+
+    python -m benchmarks.bench_history --documents 2000000 --pages 50
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from pymongo import AsyncMongoClient
+
+from core.config import settings
+from db.db_session import ensure_indexes
+from db.sandbox import get_submission_history
+
+
+LANGUAGES = ["python", "javascript", "java", "cpp"]
+STATES = ["completed", "completed", "completed", "failed", "timeout"]
+
+
+async def seed(db, documents: int, users: int, batch_size: int = 10000):
+    await db.submissions.drop()
+    start = datetime.now(timezone.utc) - timedelta(days=30)
+
+    for offset in range(0, documents, batch_size):
+        batch = []
+        for i in range(offset, min(offset + batch_size, documents)):
+            batch.append(
+                {
+                    "task_id": f"task-{i}",
+                    "user_id": f"user-{random.randrange(users)}",
+                    "language": random.choice(LANGUAGES),
+                    "code": "print('hello')\n" * 20,
+                    "status": random.choice(STATES),
+                    "result": {"stdout": "hello\n" * 20, "stderr": None, "exit_code": 0},
+                    "created_at": start + timedelta(seconds=i),
+                    "expireAt": start + timedelta(days=365),
+                }
+            )
+        await db.submissions.insert_many(batch, ordered=False)
+
+
+async def time_pages(db, user_id: str, pages: int, limit: int, **filters) -> list[float]:
+    timings = []
+    cursor = None
+    for _ in range(pages):
+        start = time.perf_counter()
+        submissions, cursor = await get_submission_history(
+            db, user_id, limit, cursor=cursor, **filters
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+        if not cursor:
+            break
+    return timings
+
+
+def _stages(plan: dict) -> set[str]:
+    stages = {plan.get("stage")}
+    for child in plan.get("inputStages", []) + [plan.get("inputStage", {})]:
+        if child:
+            stages |= _stages(child)
+    return stages
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--skip-seed", action="store_true")
+    args = parser.parse_args()
+
+    client = AsyncMongoClient(settings.DATABASE_URI)
+    db = client.get_database("ideall_bench")
+
+    if not args.skip_seed:
+        print(f"Seeding {args.documents} submissions...")
+        await seed(db, args.documents, args.users)
+    await ensure_indexes(db)
+
+    for label, filters in [
+        ("unfiltered", {}),
+        ("language", {"language": "java"}),
+        ("status", {"state": "failed"}),
+    ]:
+        timings = await time_pages(db, "user-0", args.pages, args.limit, **filters)
+        print(
+            f"{label:<11} pages={len(timings):<3} median={statistics.median(timings):.2f}ms "
+            f"max={max(timings):.2f}ms"
+        )
+
+    plan = await db.submissions.find({"user_id": "user-0"}).sort(
+        [("created_at", -1), ("_id", -1)]
+    ).limit(args.limit + 1).explain()
+    stages = _stages(plan["queryPlanner"]["winningPlan"])
+    print(f"winning plan stages: {sorted(s for s in stages if s)}")
+    if "COLLSCAN" in stages:
+        raise SystemExit("history query falls back to a collection scan")
+
+    await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
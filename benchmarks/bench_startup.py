@@ -0,0 +1,105 @@
+"""
+Cold-start cost of the API entry point.
+
+Imports `main` in fresh interpreters under `-X importtime`, reports the median
+total and the top-level packages that cost the most, and fails when the median
+exceeds --max-ms so regressions show up in CI. With --ready-url it also boots
+the server and measures the time until /ready answers 200 (needs the full stack).
+
+    python -m benchmarks.bench_startup --runs 10 --max-ms 800
+    python -m benchmarks.bench_startup --ready-url http://127.0.0.1:8011/ready
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from urllib.parse import urlparse
+
+
+def import_profile(module: str) -> tuple[float, dict[str, float]]:
+    """
+    Import a module in a fresh interpreter.
+    Returns its cumulative import time and the self time per top-level package, in ms.
+    """
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+
+    total = 0.0
+    per_package: dict[str, float] = defaultdict(float)
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        per_package[name.split(".")[0]] += int(self_us) / 1000
+        if name == module:
+            total = int(cumulative_us) / 1000
+
+    return total, per_package
+
+
+def time_to_ready(url: str, timeout: float) -> float:
+    port = urlparse(url).port or 8000
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except (urllib.error.URLError, ConnectionError):
+                pass
+            time.sleep(0.05)
+        raise SystemExit(f"{url} was not ready after {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, help="fail if the median import time exceeds this")
+    parser.add_argument("--ready-url", help="also boot the server and time /ready")
+    parser.add_argument("--ready-timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    totals = []
+    packages: dict[str, list[float]] = defaultdict(list)
+    for _ in range(args.runs):
+        total, per_package = import_profile(args.module)
+        totals.append(total)
+        for package, ms in per_package.items():
+            packages[package].append(ms)
+
+    median = statistics.median(totals)
+    print(f"import {args.module}: median={median:.1f}ms min={min(totals):.1f}ms runs={args.runs}")
+    ranked = sorted(packages.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+    for package, samples in ranked[: args.top]:
+        print(f"  {package:<24} {statistics.median(samples):7.1f}ms")
+
+    if args.ready_url:
+        print(f"time to ready: {time_to_ready(args.ready_url, args.ready_timeout):.2f}s")
+
+    if args.max_ms is not None and median > args.max_ms:
+        raise SystemExit(f"median import time {median:.1f}ms exceeds budget of {args.max_ms}ms")
+
+
+if __name__ == "__main__":
+    main()
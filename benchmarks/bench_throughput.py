@@ -0,0 +1,59 @@
+"""
+Request throughput of a running API, for comparing worker counts.
+
+Start the API with different WEB_CONCURRENCY values and run the same load
+against each, e.g. with a CPU-bound endpoint such as login (argon2 hashing):
+
+    WEB_CONCURRENCY=1 docker compose up -d web
+    python -m benchmarks.bench_throughput --url http://localhost:8000/api/user/login \\
+        --form username=bench --form password=benchpassword
+    WEB_CONCURRENCY=4 docker compose up -d web
+    python -m benchmarks.bench_throughput ...
+
+Any status code counts as a completed request; the point is server capacity.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def worker(client: httpx.AsyncClient, args, deadline: float, latencies: list[float]):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        if args.form:
+            await client.post(args.url, data=dict(field.split("=", 1) for field in args.form))
+        else:
+            await client.get(args.url)
+        latencies.append(time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="http://localhost:8000/")
+    parser.add_argument("--form", action="append", help="key=value form field, switches to POST")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20.0)
+    args = parser.parse_args()
+
+    latencies: list[float] = []
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        deadline = time.perf_counter() + args.duration
+        await asyncio.gather(
+            *(worker(client, args, deadline, latencies) for _ in range(args.concurrency))
+        )
+
+    latencies.sort()
+    print(
+        f"requests={len(latencies)} throughput={len(latencies) / args.duration:.1f} req/s "
+        f"p50={statistics.median(latencies) * 1000:.1f}ms "
+        f"p99={latencies[int(0.99 * (len(latencies) - 1))] * 1000:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,44 @@
+from functools import lru_cache
+
+import zstandard
+from core.config import settings
+
+_decompressor = zstandard.ZstdDecompressor()
+
+
+@lru_cache
+def _get_compressor(level: int) -> zstandard.ZstdCompressor:
+    return zstandard.ZstdCompressor(level=level)
+
+
+def compress_text(
+    text: str | None, threshold: int | None = None, level: int | None = None
+) -> str | bytes | None:
+    """
+    Compress a stored body with zstd if it is at least `threshold` bytes.
+    Smaller bodies, and bodies that don't shrink, stay plain strings.
+    Threshold and level default to COMPRESSION_THRESHOLD_BYTES and COMPRESSION_LEVEL.
+    """
+    if text is None:
+        return None
+
+    if threshold is None:
+        threshold = settings.COMPRESSION_THRESHOLD_BYTES
+    raw = text.encode("utf-8")
+    if len(raw) < threshold:
+        return text
+
+    compressor = _get_compressor(settings.COMPRESSION_LEVEL if level is None else level)
+    compressed = compressor.compress(raw)
+    if len(compressed) >= len(raw):
+        return text
+    return compressed
+
+
+def decompress_text(value: str | bytes | None) -> str | None:
+    """
+    Inverse of compress_text; plain strings are returned unchanged.
+    """
+    if isinstance(value, bytes):
+        return _decompressor.decompress(value).decode("utf-8")
+    return value
@@ -11,6 +11,9 @@ class Settings:
     # MonogoDB settings
     DATABASE_URI: str = os.getenv("DATABASE_URI")
     SUBMISSION_TTL_SECONDS: int = int(os.getenv("SUBMISSION_TTL_SECONDS", "3600"))
+    # zstd compression of stored code/stdout/stderr at or above the threshold
+    COMPRESSION_THRESHOLD_BYTES: int = int(os.getenv("COMPRESSION_THRESHOLD_BYTES", "1024"))
+    COMPRESSION_LEVEL: int = int(os.getenv("COMPRESSION_LEVEL", "1"))
 
     # JWT settings
     SECRET_KEY: str = os.getenv("SECRET_KEY")
@@ -24,13 +27,50 @@ class Settings:
     GUEST_QUOTA: int = int(os.getenv("GUEST_QUOTA", "1"))
     IP_EXPIRY_SECONDS: int = int(os.getenv("IP_EXPIRY_SECONDS", "86400"))
 
-    # language to Docker image mapping
+    # Worker coordination settings
+    JOB_HEARTBEAT_SECONDS: int = int(os.getenv("JOB_HEARTBEAT_SECONDS", "5"))
+    # Time a stopping worker gives running jobs before requeueing them
+    GRACEFUL_SHUTDOWN_SECONDS: int = int(os.getenv("GRACEFUL_SHUTDOWN_SECONDS", "30"))
+
+    # Docker daemon that runs the sandboxes
+    DOCKER_HOST: str = os.getenv("DOCKER_HOST", "tcp://dind:2375")
+
+    # language to Docker image mapping, built from runners/<language>/Dockerfile
+    # and tagged with a hash of the files the image is built from
     LANG_IMAGE = {
-        "python": "python:3.12-alpine",
-        "javascript": "node:20-alpine",
-        "java": "eclipse-temurin:21-jdk-alpine",
-        "cpp": "gcc:13.4.0-bookworm",
+        "python": "ownide-runner-python",
+        "javascript": "ownide-runner-javascript",
+        "java": "ownide-runner-java",
+        "cpp": "ownide-runner-cpp",
+    }
+    # Saved runner images (<language>.tar) loaded instead of building when present
+    RUNNER_IMAGE_TARBALL_DIR: str = os.getenv("RUNNER_IMAGE_TARBALL_DIR", "runners/dist")
+    # Expected image IDs per language; images that don't match are not used
+    RUNNER_IMAGE_PINS: str = os.getenv("RUNNER_IMAGE_PINS", "runners/pins.json")
+
+    # Java execution tuning
+    # "auto" runs `java Main.java` through the single-file launcher (one JVM start)
+    # when Main is the first declared class, "javac" always compiles ahead of running.
+    JAVA_EXEC_MODE: str = os.getenv("JAVA_EXEC_MODE", "auto")
+    # Sized for the 128 MB container: the JVM needs ~30 MB beyond the heap even
+    # without javac loaded, and the launcher runs javac in the same JVM. Capping
+    # metaspace and code cache turns overruns into OutOfMemoryError, not a SIGKILL.
+    JAVA_OPTS: str = os.getenv(
+        "JAVA_OPTS",
+        "-XX:+UseSerialGC -XX:TieredStopAtLevel=1 -XX:-UsePerfData "
+        "-XX:MaxRAMPercentage=40 -XX:MaxMetaspaceSize=40m -XX:ReservedCodeCacheSize=16m "
+        "-Xss1m -Xshare:auto",
+    )
+    # AppCDS archive baked into the Java runner image, used only if present
+    JAVA_CDS_ARCHIVE: str = os.getenv("JAVA_CDS_ARCHIVE", "/opt/cds/java.jsa")
+
+    # C++ compiler flag profiles, selected per submission
+    CPP_PROFILES = {
+        "fast": "-O0",
+        "judge": "-O2",
     }
+    # Precompiled headers baked into the C++ runner image, one variant per profile
+    CPP_PCH_DIR: str = os.getenv("CPP_PCH_DIR", "/opt/pch")
 
 
 
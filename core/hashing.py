@@ -1,13 +1,18 @@
+from functools import lru_cache
 from pwdlib import PasswordHash
 
-password_hash = PasswordHash.recommended()
+
+@lru_cache(maxsize=1)
+def _password_hash() -> PasswordHash:
+    # Built on first use so the argon2 backend isn't loaded at startup
+    return PasswordHash.recommended()
 
 
 class Hasher:
     @staticmethod
     def verify_password(plain_password, hashed_password):
-        return password_hash.verify(plain_password, hashed_password)
+        return _password_hash().verify(plain_password, hashed_password)
 
     @staticmethod
     def get_password_hash(password):
-        return password_hash.hash(password)
+        return _password_hash().hash(password)
@@ -3,10 +3,11 @@ from datetime import timedelta, timezone
 from typing import Optional
 
 from core.config import settings
-import jwt
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+    import jwt
+
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
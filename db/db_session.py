@@ -1,20 +1,25 @@
-from pymongo import AsyncMongoClient
+import os
+from pymongo import ASCENDING, DESCENDING, AsyncMongoClient, IndexModel
 from pymongo.asynchronous.database import AsyncDatabase
 from pymongo.server_api import ServerApi
 from core.config import settings
 
 _client: AsyncMongoClient | None = None
+_client_pid: int | None = None
 
 
 async def get_client() -> AsyncMongoClient:
-    global _client
+    global _client, _client_pid
 
-    if _client is None:
+    # A client inherited through fork shares its parent's sockets, so each
+    # worker process opens its own
+    if _client is None or _client_pid != os.getpid():
         uri = settings.DATABASE_URI
         _client = AsyncMongoClient(
             uri,
             server_api=ServerApi(version="1", strict=True, deprecation_errors=True),
         )
+        _client_pid = os.getpid()
 
         # Optional: verify once
         await _client.admin.command({"ping": 1})
@@ -32,8 +37,35 @@ async def close_client():
 
 async def get_db() -> AsyncDatabase:
     client = await get_client()
-    db = client.get_database("ideall")
+    return client.get_database("ideall")
+
 
-    # Create TTL index on 'expireAt' field if not exists
-    await db.submissions.create_index("expireAt", expireAfterSeconds=0)
-    return db
+async def ensure_indexes(db: AsyncDatabase):
+    """
+    Create the submissions indexes once at startup.
+    The history indexes end in (created_at, _id) so keyset pages are index-only range scans.
+    """
+    await db.submissions.create_indexes(
+        [
+            # TTL index on 'expireAt'
+            IndexModel("expireAt", expireAfterSeconds=0),
+            IndexModel("task_id", unique=True),
+            IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel(
+                [
+                    ("user_id", ASCENDING),
+                    ("language", ASCENDING),
+                    ("created_at", DESCENDING),
+                    ("_id", DESCENDING),
+                ]
+            ),
+            IndexModel(
+                [
+                    ("user_id", ASCENDING),
+                    ("status", ASCENDING),
+                    ("created_at", DESCENDING),
+                    ("_id", DESCENDING),
+                ]
+            ),
+        ]
+    )
@@ -0,0 +1,179 @@
+"""
+Shared bookkeeping for background executions across workers and replicas.
+
+Every running job is recorded in Redis under the worker that owns it, and each
+worker keeps a heartbeat key alive. Jobs cut short by a shutdown are pushed to a
+shared queue, jobs of workers whose heartbeat expired (crashed or killed) are
+reclaimed into the same queue, and every worker consumes it.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import traceback
+from typing import Awaitable, Callable
+
+import redis.asyncio as redis
+from core.config import settings
+from schemas.code import CodeRequest
+
+
+INFLIGHT_KEY = "jobs:inflight"  # hash: task_id -> {"worker", "request"}
+REQUEUE_KEY = "jobs:requeue"  # list of {"task_id", "request"}
+HEARTBEAT_KEY = "jobs:worker:{worker}"
+# Longest pause between retries while Redis is unreachable
+MAX_BACKOFF_SECONDS = 30
+
+# Requeue a job only if its in-flight entry is still exactly what the sweeper
+# read and its owner's heartbeat is still gone, all in one atomic step.
+# KEYS: inflight hash, requeue list, owner's heartbeat key
+# ARGV: task_id, entry as read, payload to push
+_RECLAIM_SCRIPT = """
+if redis.call('HGET', KEYS[1], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+if redis.call('EXISTS', KEYS[3]) == 1 then
+    return 0
+end
+redis.call('HDEL', KEYS[1], ARGV[1])
+redis.call('RPUSH', KEYS[2], ARGV[3])
+return 1
+"""
+
+# Requeued jobs this process picked up; request-scoped jobs are drained by the server
+_local_jobs: set[asyncio.Task] = set()
+
+
+def worker_id() -> str:
+    # Computed on each call so forked workers never report their parent's pid
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+async def track_job(redis_client: redis.Redis, task_id: str, code_request: CodeRequest):
+    entry = {"worker": worker_id(), "request": code_request.model_dump()}
+    await redis_client.hset(INFLIGHT_KEY, task_id, json.dumps(entry))
+
+
+async def untrack_job(redis_client: redis.Redis, task_id: str):
+    await redis_client.hdel(INFLIGHT_KEY, task_id)
+
+
+async def requeue_job(redis_client: redis.Redis, task_id: str, code_request: CodeRequest):
+    """
+    Hand an unfinished job back to the shared queue for any worker to run.
+    """
+    payload = json.dumps({"task_id": task_id, "request": code_request.model_dump()})
+    async with redis_client.pipeline(transaction=True) as pipe:
+        await pipe.hdel(INFLIGHT_KEY, task_id)
+        await pipe.rpush(REQUEUE_KEY, payload)
+        await pipe.execute()
+
+
+async def reclaim_orphaned_jobs(redis_client: redis.Redis) -> int:
+    """
+    Requeue in-flight jobs whose worker stopped sending heartbeats.
+    The snapshot may be stale by the time a job is reclaimed, so each one is
+    compared and moved atomically: if another sweeper got there first or a live
+    worker has tracked the job since, the entry differs and it is left alone.
+    """
+    reclaimed = 0
+    inflight = await redis_client.hgetall(INFLIGHT_KEY)
+    reclaim = redis_client.register_script(_RECLAIM_SCRIPT)
+
+    for task_id, raw in inflight.items():
+        entry = json.loads(raw)
+        heartbeat_key = HEARTBEAT_KEY.format(worker=entry["worker"])
+        if await redis_client.exists(heartbeat_key):
+            continue
+
+        payload = json.dumps({"task_id": task_id, "request": entry["request"]})
+        reclaimed += await reclaim(
+            keys=[INFLIGHT_KEY, REQUEUE_KEY, heartbeat_key], args=[task_id, raw, payload]
+        )
+
+    return reclaimed
+
+
+async def send_heartbeats(redis_client: redis.Redis):
+    """
+    Keep this worker's heartbeat alive and sweep up jobs of dead workers.
+    """
+    interval = settings.JOB_HEARTBEAT_SECONDS
+    key = HEARTBEAT_KEY.format(worker=worker_id())
+
+    while True:
+        # A failed beat is retried on the next one; backing off further would let
+        # the key expire and hand this worker's jobs to others
+        try:
+            await redis_client.set(key, "1", ex=interval * 3)
+            reclaimed = await reclaim_orphaned_jobs(redis_client)
+            if reclaimed:
+                print(f"Requeued {reclaimed} job(s) from stopped workers.")
+        except Exception as e:
+            print(f"Heartbeat failed, retrying in {interval}s: {e!r}")
+        await asyncio.sleep(interval)
+
+
+async def consume_requeued_jobs(
+    redis_client: redis.Redis,
+    run: Callable[[str, CodeRequest], Awaitable[None]],
+    stopping: asyncio.Event,
+):
+    """
+    Run jobs handed back by other workers until `stopping` is set.
+    Cancelling a blocked BLPOP can drop the item it was about to receive, so the
+    loop polls in short blocks and exits between them instead of being cancelled.
+    """
+    failures = 0
+    while not stopping.is_set():
+        try:
+            item = await redis_client.blpop([REQUEUE_KEY], timeout=1)
+        except Exception as e:
+            failures += 1
+            delay = min(2**failures, MAX_BACKOFF_SECONDS)
+            print(f"Could not read requeued jobs, retrying in {delay}s: {e!r}")
+            try:
+                await asyncio.wait_for(stopping.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        failures = 0
+        if not item:
+            continue
+
+        try:
+            payload = json.loads(item[1])
+            code_request = CodeRequest(**payload["request"])
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Dropping malformed requeued job {item[1]!r}: {e!r}")
+            continue
+
+        task = asyncio.create_task(run(payload["task_id"], code_request))
+        _local_jobs.add(task)
+        task.add_done_callback(_local_jobs.discard)
+
+
+def report_crash(task: asyncio.Task):
+    """
+    Done-callback for long-running background tasks, so one that dies shows its
+    traceback instead of stopping silently.
+    """
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Background task {task.get_name()} crashed:")
+        traceback.print_exception(task.exception())
+
+
+async def drain_local_jobs(timeout: float):
+    """
+    Give requeued jobs running here time to finish, then cancel the rest so
+    they hand themselves back to the queue.
+    """
+    if not _local_jobs:
+        return
+
+    _, pending = await asyncio.wait(set(_local_jobs), timeout=timeout)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
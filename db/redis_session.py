@@ -1,14 +1,19 @@
+import os
 import redis.asyncio as redis
 from core.config import settings
 
 _redis_client: redis.Redis | None = None
+_redis_client_pid: int | None = None
 
 
 async def get_redis_client() -> redis.Redis:
-    global _redis_client
+    global _redis_client, _redis_client_pid
 
-    if _redis_client is None:
+    # A client inherited through fork shares its parent's sockets, so each
+    # worker process opens its own
+    if _redis_client is None or _redis_client_pid != os.getpid():
         _redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        _redis_client_pid = os.getpid()
         # Verify connection
         await _redis_client.ping()
         print("Connected to Redis!")
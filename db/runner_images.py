@@ -0,0 +1,229 @@
+"""
+Build, load and verify the per-language runner images on a Docker host.
+
+The API prepares images in the background at startup and reports progress on
+/ready. Run `python -m db.runner_images` to do the same ahead of a deployment,
+optionally saving tarballs and pins for hosts without registry access.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from core.config import settings
+
+if TYPE_CHECKING:
+    import docker
+
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+RUNNERS_DIR = ROOT_DIR / "runners"
+# Builds and tarball loads can stay silent for minutes
+BUILD_TIMEOUT_SECONDS = 600
+
+# language -> "pending", "ready" or the reason the image is unavailable
+_image_status: dict[str, str] = {language: "pending" for language in settings.LANG_IMAGE}
+# language -> image ID that containers are started from
+_image_ids: dict[str, str] = {}
+
+
+def _resolve(path: str) -> Path:
+    return Path(path) if os.path.isabs(path) else ROOT_DIR / path
+
+
+def _load_pins() -> dict[str, str]:
+    pins_file = _resolve(settings.RUNNER_IMAGE_PINS)
+    if not pins_file.is_file():
+        return {}
+    with open(pins_file, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@lru_cache
+def runner_image_tag(language: str) -> str:
+    """
+    Return the image reference for a language, tagged with a hash of its
+    runners/<language>/ files and the shared measure.sh. Changing any of them
+    yields a new tag, so hosts rebuild instead of reusing a stale image.
+    """
+    language_dir = RUNNERS_DIR / language
+    files = sorted(path for path in language_dir.rglob("*") if path.is_file())
+    files.append(RUNNERS_DIR / "measure.sh")
+
+    digest = hashlib.sha256()
+    for path in files:
+        digest.update(path.relative_to(RUNNERS_DIR).as_posix().encode())
+        digest.update(b"\0")
+        digest.update(path.read_bytes())
+    return f"{settings.LANG_IMAGE[language]}:{digest.hexdigest()[:12]}"
+
+
+def connect(host: str) -> "docker.DockerClient":
+    # Imported here so docker-py and requests stay off the startup path
+    import docker
+
+    return docker.DockerClient(base_url=host, timeout=BUILD_TIMEOUT_SECONDS)
+
+
+def get_runner_image(language: str) -> str | None:
+    """
+    Return the pinned image ID for a language, or None if it is not ready yet.
+    """
+    return _image_ids.get(language)
+
+
+def runner_images_status() -> dict[str, str]:
+    return dict(_image_status)
+
+
+def mark_runner_images_unavailable(reason: str):
+    """
+    Record why the images that aren't ready yet can't be prepared, e.g. the
+    Docker host is unreachable, so /ready doesn't report them as pending forever.
+    """
+    for language, status in _image_status.items():
+        if status != "ready":
+            _image_status[language] = f"unavailable: {reason}"
+
+
+def missing_runner_images(client: "docker.DockerClient") -> list[str]:
+    """
+    Return the languages whose runner image is not on the Docker host yet.
+    """
+    from docker.errors import ImageNotFound
+
+    missing = []
+    for language in settings.LANG_IMAGE:
+        try:
+            client.images.get(runner_image_tag(language))
+        except ImageNotFound:
+            missing.append(language)
+    return missing
+
+
+def prepare_runner_image(client: "docker.DockerClient", language: str) -> str:
+    """
+    Make the runner image for a language available on the Docker host.
+    Uses an existing image if present, otherwise loads it from a saved tarball,
+    and builds it from runners/<language>/Dockerfile as a last resort.
+    Returns the image ID.
+    """
+    from docker.errors import ImageNotFound
+
+    tag = runner_image_tag(language)
+
+    try:
+        return client.images.get(tag).id
+    except ImageNotFound:
+        pass
+
+    tarball = _resolve(settings.RUNNER_IMAGE_TARBALL_DIR) / f"{language}.tar"
+    if tarball.is_file():
+        print(f"Loading {tag} from {tarball}...")
+        with open(tarball, "rb") as f:
+            client.images.load(f)
+        try:
+            return client.images.get(tag).id
+        except ImageNotFound:
+            print(f"{tarball} does not contain {tag}, building instead.")
+
+    print(f"Building {tag}...")
+    image, _ = client.images.build(
+        path=str(RUNNERS_DIR), dockerfile=f"{language}/Dockerfile", tag=tag, rm=True
+    )
+    return image.id
+
+
+def prepare_runner_images(client: "docker.DockerClient"):
+    """
+    Prepare every runner image and record its status for the readiness probe.
+    An image whose ID doesn't match its pin is reported and never used.
+    """
+    pins = _load_pins()
+
+    for language in settings.LANG_IMAGE:
+        try:
+            image_id = prepare_runner_image(client, language)
+        except Exception as e:
+            _image_status[language] = f"unavailable: {e}"
+            print(f"Runner image for {language} is unavailable: {e}")
+            continue
+
+        pinned = pins.get(language)
+        if pinned and pinned != image_id:
+            _image_status[language] = f"digest mismatch: expected {pinned}, found {image_id}"
+            print(f"Runner image for {language} does not match its pin.")
+            continue
+
+        _image_ids[language] = image_id
+        _image_status[language] = "ready"
+        print(f"Runner image for {language} is ready ({image_id}).")
+
+
+def save_runner_images(client: "docker.DockerClient", output_dir: Path):
+    """
+    Save every prepared runner image to <output_dir>/<language>.tar and write
+    their IDs to the pins file, so other hosts can load and verify them.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    for language, image_id in _image_ids.items():
+        image = client.images.get(image_id)
+        with open(output_dir / f"{language}.tar", "wb") as f:
+            for chunk in image.save(named=True):
+                f.write(chunk)
+
+    pins_file = _resolve(settings.RUNNER_IMAGE_PINS)
+    with open(pins_file, "w", encoding="utf-8") as f:
+        json.dump(_image_ids, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prepare the per-language runner images.")
+    parser.add_argument(
+        "--host",
+        action="append",
+        help="Docker host to prepare (repeatable), defaults to $DOCKER_HOST",
+    )
+    parser.add_argument(
+        "--save",
+        action="store_true",
+        help="Save the images to RUNNER_IMAGE_TARBALL_DIR and write RUNNER_IMAGE_PINS",
+    )
+    args = parser.parse_args()
+
+    failed_hosts = []
+    for host in args.host or [settings.DOCKER_HOST]:
+        print(f"Preparing runner images on {host}")
+        # Image IDs are per host, never carry one host's results over to the next
+        _image_ids.clear()
+        _image_status.update(dict.fromkeys(settings.LANG_IMAGE, "pending"))
+
+        try:
+            client = connect(host)
+            prepare_runner_images(client)
+        except Exception as e:
+            print(f"Could not prepare runner images on {host}: {e}")
+            failed_hosts.append(host)
+            continue
+
+        if any(status != "ready" for status in _image_status.values()):
+            # Saving now would write pins for only part of the languages
+            print(f"Runner images on {host} are not all ready, nothing saved.")
+            failed_hosts.append(host)
+            continue
+
+        if args.save:
+            save_runner_images(client, _resolve(settings.RUNNER_IMAGE_TARBALL_DIR))
+
+    if failed_hosts:
+        raise SystemExit(f"Runner images failed on: {', '.join(failed_hosts)}")
+
+
+if __name__ == "__main__":
+    main()
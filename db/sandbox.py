@@ -1,90 +1,163 @@
 import asyncio
+import base64
 from datetime import datetime, timedelta, timezone
 import os
+import re
 import time
 from uuid import uuid4
-import docker
 from fastapi import Depends, HTTPException, Request, Response, status
 from db.redis_session import get_redis_client
+from db.runner_images import get_runner_image
 from db.user import get_optional_current_user
 from schemas.code import CodeRequest, CodeResult
+from core.compression import compress_text, decompress_text
 from core.config import settings
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import DESCENDING
 from pymongo.asynchronous.database import AsyncDatabase
 from pymongo.write_concern import WriteConcern
 
 
 _docker_client = None
+_docker_client_pid: int | None = None
 TIMEOUT_SECONDS = 5
+# Approximate cost of a docker exec round trip, subtracted from host-side times
+EXEC_OVERHEAD_SECONDS = 0.05
+# Wrapper baked into the runner images that reports in-container elapsed time
+MEASURE_WRAPPER = "/usr/local/bin/measure"
+ELAPSED_MARKER = "\n__OWNIDE_ELAPSED__ "
+
+# Fields left out of history pages unless the client asks for bodies
+HISTORY_BODY_FIELDS = {"code": 0, "result.stdout": 0, "result.stderr": 0}
+
+_JAVA_COMMENT_RE = re.compile(r"//[^\n]*|/\*.*?\*/", re.DOTALL)
+_JAVA_TYPE_DECL_RE = re.compile(r"\b(?:class|interface|enum|record)\s+(\w+)")
 
 def get_docker_client():
-    global _docker_client
-    if _docker_client:
+    """
+    Return this process's Docker client, connecting on first use.
+    Raises if the daemon is unreachable; wait_for_docker retries during startup.
+    """
+    global _docker_client, _docker_client_pid
+    # Connections don't survive a fork, so each worker process opens its own
+    if _docker_client and _docker_client_pid == os.getpid():
         return _docker_client
 
-    base_url = os.getenv("DOCKER_HOST", "tcp://dind:2375")
+    # Imported here so docker-py and requests stay off the startup path
+    import docker
+
+    client = docker.DockerClient(base_url=settings.DOCKER_HOST, timeout=10)
+    client.ping()
+    _docker_client = client
+    _docker_client_pid = os.getpid()
+    return _docker_client
 
-    max_retries = 15 
+
+async def wait_for_docker(max_retries: int = 15):
+    """
+    Connect to the Docker daemon, retrying with backoff without blocking the event loop.
+    """
     for i in range(max_retries):
         try:
             print(f"Attempting to connect to Docker (Attempt {i+1}/{max_retries})...")
-            client = docker.DockerClient(base_url=base_url, timeout=10)
-            client.ping()
+            client = await asyncio.to_thread(get_docker_client)
             print("Successfully connected to Docker daemon.")
-            _docker_client = client
-            return _docker_client
-        except (docker.errors.DockerException, Exception) as e:
+            return client
+        except Exception as e:
             if i == max_retries - 1:
-                print("Could not connect to Docker daemon after 15 attempts.")
+                print(f"Could not connect to Docker daemon after {max_retries} attempts.")
                 raise e
             # Wait longer as attempts increase (2s, 4s, 6s...)
-            time.sleep(min(i * 2, 10) + 2) 
+            await asyncio.sleep(min(i * 2, 10) + 2)
 
-    return None
 
+def _java_uses_launcher(code: str) -> bool:
+    """
+    Decide whether a Java submission can run through the single-file source launcher.
+    The launcher executes the first top-level type in the file, so it is only safe
+    when that type is Main; otherwise fall back to javac + java.
+    """
+    if settings.JAVA_EXEC_MODE == "javac":
+        return False
 
-def _get_exec_command(language: str, code: str, input_data: str | None):
+    match = _JAVA_TYPE_DECL_RE.search(_JAVA_COMMENT_RE.sub("", code))
+    return bool(match) and match.group(1) == "Main"
+
+
+def _get_exec_command(
+    language: str, code: str, input_data: str | None, profile: str = "fast"
+):
     """
-    Generate the shell command and environment variables to execute code in a given language.
+    Generate the shell commands and environment variables to execute code in a given language.
+    Compiled languages get a separate compile command so compile and run time can be measured apart.
     Args:
         language (str): Programming language (e.g., 'python', 'javascript', 'java', 'cpp').
         code (str): The source code to execute.
         input_data (str | None): Optional input data for the program. Default name for input file is 'user_file.txt'.
+        profile (str): Compiler flag profile from settings.CPP_PROFILES, used for C++ only.
     Returns:
-        Tuple[list[str], dict[str, str]]: Command list and environment variables.
+        Tuple[list[str] | None, list[str], dict[str, str]]: Compile command (None when the
+        language has no separate compile step), run command and environment variables.
     """
-    shell = []
+    setup = []
+    build = []
+    run = []
 
     if input_data is not None:
-        shell.append('printf "%s" "$INPUT_DATA" > user_file.txt')
+        setup.append('printf "%s" "$INPUT_DATA" > user_file.txt')
 
     if language == "python":
-        shell.append('printf "%s" "$CODE" > main.py')
-        shell.append("python3 main.py")
+        setup.append('printf "%s" "$CODE" > main.py')
+        run.append("python3 main.py")
 
     elif language == "javascript":
-        shell.append('printf "%s" "$CODE" > main.js')
-        shell.append("node main.js")
+        setup.append('printf "%s" "$CODE" > main.js')
+        run.append("node main.js")
 
     elif language == "java":
-        shell.append('printf "%s" "$CODE" > Main.java')
-        shell.append("javac Main.java")
-        shell.append("java Main")
+        setup.append('printf "%s" "$CODE" > Main.java')
+        if _java_uses_launcher(code):
+            # Reuse the AppCDS archive baked into the runner image when it exists;
+            # the archive was trained on the launcher, so only this path uses it.
+            # CDS warnings go to stderr instead of the program's stdout, so a
+            # rejected archive stays visible without corrupting the output
+            run.append(
+                'CDS=$([ -f "$CDS_ARCHIVE" ] && echo "-XX:SharedArchiveFile=$CDS_ARCHIVE'
+                ' -Xlog:cds*=off -Xlog:cds*=warning:stderr" || true)'
+            )
+            run.append(f"java $CDS {settings.JAVA_OPTS} Main.java")
+        else:
+            javac_opts = " ".join(f"-J{opt}" for opt in settings.JAVA_OPTS.split())
+            build.append(f"javac {javac_opts} Main.java")
+            run.append(f"java {settings.JAVA_OPTS} Main")
 
     elif language == "cpp":
-        shell.append('printf "%s" "$CODE" > main.cpp')
-        shell.append("g++ main.cpp -o main")
-        shell.append("./main")
+        setup.append('printf "%s" "$CODE" > main.cpp')
+        # GCC looks for <header>.gch in the PCH dir before the real header and
+        # ignores the dir if the image doesn't ship one
+        flags = settings.CPP_PROFILES[profile]
+        build.append(f"g++ {flags} -I{settings.CPP_PCH_DIR} main.cpp -o main")
+        run.append("./main")
 
     else:
         raise ValueError("Unsupported language")
 
-    cmd = ["sh", "-c", " && ".join(shell)]
+    if build:
+        compile_cmd = ["sh", "-c", " && ".join(setup + build)]
+        run_cmd = ["sh", "-c", " && ".join(run)]
+    else:
+        compile_cmd = None
+        run_cmd = ["sh", "-c", " && ".join(setup + run)]
+
     env = {
         "CODE": code,
         "INPUT_DATA": input_data or "",
     }
+    if language == "java":
+        env["CDS_ARCHIVE"] = settings.JAVA_CDS_ARCHIVE
 
-    return cmd, env
+    return compile_cmd, run_cmd, env
 
 
 """
@@ -155,15 +228,75 @@ CPP Example with input_data:
 """
 
 
+def _decode_output(output) -> tuple[str | None, str | None]:
+    stdout_bytes, stderr_bytes = output
+    stdout = stdout_bytes.decode("utf-8", errors="replace") if stdout_bytes else None
+    stderr = stderr_bytes.decode("utf-8", errors="replace") if stderr_bytes else None
+    return stdout, stderr
+
+
+def _split_elapsed(stderr: str | None) -> tuple[str | None, float | None]:
+    """
+    Strip the trailer appended by the measure wrapper from stderr.
+    Returns the program's own stderr and the measured time, if the trailer was found.
+    """
+    if not stderr:
+        return stderr, None
+
+    head, marker, tail = stderr.rpartition(ELAPSED_MARKER)
+    if not marker:
+        return stderr, None
+
+    try:
+        elapsed = float(tail)
+    except ValueError:
+        return stderr, None
+
+    return head or None, elapsed
+
+
+def _join_output(*parts: str | None) -> str | None:
+    return "".join(part for part in parts if part) or None
+
+
+async def _exec_measured(container, cmd: list[str], env: dict[str, str], timeout: float):
+    """
+    Run a command inside the container through the measure wrapper.
+    Returns exit code, stdout, stderr and elapsed seconds, preferring the wrapper's
+    in-container measurement over the host-side one.
+    """
+    start_time = time.perf_counter()
+    exec_log = await asyncio.wait_for(
+        asyncio.to_thread(container.exec_run, cmd=[MEASURE_WRAPPER, *cmd], environment=env, demux=True),
+        timeout=timeout
+    )
+    host_elapsed = max(0.0, (time.perf_counter() - start_time) - EXEC_OVERHEAD_SECONDS)
+
+    stdout, stderr = _decode_output(exec_log.output)
+    stderr, elapsed = _split_elapsed(stderr)
+    if elapsed is None:
+        elapsed = host_elapsed
+
+    return exec_log.exit_code, stdout, stderr, round(elapsed, 4)
+
+
 async def execute_code(request: CodeRequest) -> CodeResult:
-    image = settings.LANG_IMAGE.get(request.language)
-    if not image:
+    if request.language not in settings.LANG_IMAGE:
         return CodeResult(stdout=None, stderr="Unsupported language", exit_code=1)
 
-    client = await asyncio.to_thread(get_docker_client)
+    image = get_runner_image(request.language)
+    if not image:
+        return CodeResult(
+            stdout=None,
+            stderr=f"Runner image for {request.language} is not ready",
+            exit_code=1,
+            error_type="system",
+        )
+
     container = None
     
     try:
+        client = await asyncio.to_thread(get_docker_client)
         container = await asyncio.to_thread(
             client.containers.run,
             image=image, 
@@ -180,35 +313,57 @@ async def execute_code(request: CodeRequest) -> CodeResult:
             network_disabled=True,      # Total network isolation
         )
 
-        cmd, env = _get_exec_command(request.language, request.code, request.input_data)
-        start_time = time.perf_counter()
+        compile_cmd, run_cmd, env = _get_exec_command(
+            request.language, request.code, request.input_data, request.profile
+        )
+        deadline = time.perf_counter() + TIMEOUT_SECONDS
+        compile_time = None
+        # Warnings and notes from a successful compile, shown ahead of the program's stderr
+        compile_output = None
 
         try:
-            exec_log = await asyncio.wait_for(
-                asyncio.to_thread(container.exec_run, cmd=cmd, environment=env, demux=True),
-                timeout=TIMEOUT_SECONDS
+            if compile_cmd:
+                exit_code, stdout, stderr, compile_time = await _exec_measured(
+                    container, compile_cmd, env, TIMEOUT_SECONDS
+                )
+
+                if exit_code != 0:
+                    return CodeResult(
+                        stdout=stdout,
+                        stderr=stderr,
+                        exit_code=exit_code,
+                        compile_time=compile_time,
+                        error_type="compile",
+                    )
+                compile_output = _join_output(stdout, stderr)
+
+            exit_code, stdout, stderr, execution_time = await _exec_measured(
+                container, run_cmd, env, max(0.0, deadline - time.perf_counter())
             )
-            
-            end_time = time.perf_counter()
-            execution_time = max(0.0, (end_time - start_time) - 0.05)
 
-            stdout_bytes, stderr_bytes = exec_log.output
-            stdout = stdout_bytes.decode("utf-8", errors="replace") if stdout_bytes else None
-            stderr = stderr_bytes.decode("utf-8", errors="replace") if stderr_bytes else None
+            if exit_code == 0:
+                error_type = None
+            elif compile_cmd:
+                error_type = "runtime"
+            else:
+                # Without a separate compile step, compile errors surface at run time
+                error_type = "compile" if not stdout and stderr else "runtime"
 
             return CodeResult(
                 stdout=stdout,
-                stderr=stderr,
-                exit_code=exec_log.exit_code,
-                execution_time=round(execution_time, 4),
-                error_type="compile" if not stdout and stderr and exec_log.exit_code != 0 else ("runtime" if exec_log.exit_code != 0 else None),
+                stderr=_join_output(compile_output, stderr),
+                exit_code=exit_code,
+                compile_time=compile_time,
+                execution_time=execution_time,
+                error_type=error_type,
             )
 
         except asyncio.TimeoutError:
             return CodeResult(
                 stdout=None, 
-                stderr="Execution timed out after 5 seconds", 
+                stderr=_join_output(compile_output, "Execution timed out after 5 seconds"), 
                 exit_code=124, # Standard Linux timeout exit code
+                compile_time=compile_time,
                 execution_time=TIMEOUT_SECONDS,
                 error_type="runtime"
             )
@@ -236,7 +391,7 @@ async def create_initial_submission(
         "task_id": task_id,
         "user_id": user_id,
         "language": code_request.language,
-        "code": code_request.code,
+        "code": compress_text(code_request.code),
         "status": "pending",
         "result": None,
         "created_at": now,
@@ -250,18 +405,108 @@ async def create_initial_submission(
 async def update_submission_result(
     db: AsyncDatabase, task_id: str, status: str, result: CodeResult
 ):
+    stored_result = result.model_dump()
+    stored_result["stdout"] = compress_text(result.stdout)
+    stored_result["stderr"] = compress_text(result.stderr)
+
     await db.submissions.update_one(
         {"task_id": task_id},
         {
             "$set": {
                 "status": status,
-                "result": result.model_dump(),
+                "result": stored_result,
                 "updated_at": datetime.now(timezone.utc),
             }
         },
     )
 
 
+def inflate_submission(submission: dict) -> dict:
+    """
+    Decompress the stored code and output bodies of a submission in place.
+    Only called when a client actually asks for the bodies.
+    """
+    if "code" in submission:
+        submission["code"] = decompress_text(submission["code"])
+
+    result = submission.get("result")
+    if result:
+        for field in ("stdout", "stderr"):
+            if field in result:
+                result[field] = decompress_text(result[field])
+
+    return submission
+
+
+def _encode_history_cursor(created_at: datetime, submission_id: ObjectId) -> str:
+    # MongoDB stores dates with millisecond precision and returns them naive in UTC
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    millis = round(created_at.timestamp() * 1000)
+    raw = f"{millis}:{submission_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_history_cursor(cursor: str) -> tuple[datetime, ObjectId]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        millis, submission_id = raw.split(":")
+        created_at = datetime.fromtimestamp(int(millis) / 1000, tz=timezone.utc)
+        return created_at, ObjectId(submission_id)
+    except (ValueError, InvalidId, OverflowError, OSError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor.",
+        )
+
+
+async def get_submission_history(
+    db: AsyncDatabase,
+    user_id: str,
+    limit: int,
+    cursor: str | None = None,
+    language: str | None = None,
+    state: str | None = None,
+    include_body: bool = False,
+) -> tuple[list[dict], str | None]:
+    """
+    Fetch one page of a user's submissions, newest first.
+    Pages are keyed on (created_at, _id) so every page is a bounded index range scan,
+    however deep the client paginates.
+    Returns the submissions and the cursor for the next page, or None on the last page.
+    """
+    query = {"user_id": user_id}
+    if language:
+        query["language"] = language
+    if state:
+        query["status"] = state
+    if cursor:
+        created_at, submission_id = _decode_history_cursor(cursor)
+        query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": submission_id}},
+        ]
+
+    projection = None if include_body else HISTORY_BODY_FIELDS
+    submissions = await (
+        db.submissions.find(query, projection)
+        .sort([("created_at", DESCENDING), ("_id", DESCENDING)])
+        .limit(limit + 1)
+        .to_list()
+    )
+
+    next_cursor = None
+    if len(submissions) > limit:
+        submissions = submissions[:limit]
+        last = submissions[-1]
+        next_cursor = _encode_history_cursor(last["created_at"], last["_id"])
+
+    if include_body:
+        submissions = [inflate_submission(submission) for submission in submissions]
+
+    return submissions, next_cursor
+
+
 async def get_visitor_id(
     request: Request, response: Response, user=Depends(get_optional_current_user)
 ) -> str:
@@ -283,6 +528,18 @@ async def get_visitor_id(
     return guest_id
 
 
+async def require_runner_image(code_request: CodeRequest):
+    """
+    Reject submissions for a language whose runner image is not ready yet.
+    Routes list it before check_quota so a refused submission uses no guest quota.
+    """
+    if not get_runner_image(code_request.language):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Runner image for {code_request.language} is not ready",
+        )
+
+
 async def check_quota(
     visitor_id: str = Depends(get_visitor_id),
     user=Depends(get_optional_current_user),
@@ -297,13 +554,15 @@ async def check_quota(
 
     redis_key = f"quota:{visitor_id}"
 
-    count = await redis.get(redis_key)
-    if count and int(count) >= settings.GUEST_QUOTA:
+    # Increment first and compare after, so concurrent requests across workers
+    # and replicas can't all pass a stale read
+    async with redis.pipeline(transaction=True) as pipe:
+        await pipe.incr(redis_key)
+        await pipe.expire(redis_key, settings.IP_EXPIRY_SECONDS, nx=True)
+        count, _ = await pipe.execute()
+
+    if count > settings.GUEST_QUOTA:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="Guest quota exceeded. Please log in for unlimited access.",
         )
-    async with redis.pipeline(transaction=True) as pipe:
-        await pipe.incr(redis_key)
-        await pipe.expire(redis_key, settings.IP_EXPIRY_SECONDS, nx=True)
-        await pipe.execute()
@@ -1,7 +1,6 @@
 from typing import Optional
 from fastapi import Depends
 from fastapi.security import OAuth2PasswordBearer
-import jwt
 from core.config import settings
 from schemas.token import TokenData
 from db.db_session import get_db
@@ -73,6 +72,8 @@ async def get_current_user(
     Retrieve the current user based on the provided JWT token.
     Raises HTTPException if the token is invalid or the user does not exist.
     """
+    import jwt
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
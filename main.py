@@ -1,11 +1,176 @@
+import asyncio
+import signal
+import threading
+from contextlib import asynccontextmanager
+from typing import Callable
 from apis.base import api_router
+from apis.v1.route_sandbox import run_requeued_task
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from core.config import settings
+from db.db_session import ensure_indexes, get_db
+from db.jobs import (
+    HEARTBEAT_KEY,
+    consume_requeued_jobs,
+    drain_local_jobs,
+    report_crash,
+    send_heartbeats,
+    worker_id,
+)
+from db.redis_session import get_redis_client
+from db.runner_images import (
+    BUILD_TIMEOUT_SECONDS,
+    connect,
+    mark_runner_images_unavailable,
+    missing_runner_images,
+    prepare_runner_images,
+    runner_images_status,
+)
+from db.sandbox import wait_for_docker
 from fastapi.middleware.cors import CORSMiddleware
 
 
+# Longest pause between startup retries while Docker or MongoDB are unreachable
+STARTUP_RETRY_MAX_SECONDS = 300
+
+
+async def _prepare_runner_images_once(redis):
+    client = await wait_for_docker()
+
+    # Images already on the host only need verifying, which takes milliseconds
+    if not await asyncio.to_thread(missing_runner_images, client):
+        await asyncio.to_thread(prepare_runner_images, client)
+        return
+
+    def build():
+        # Connecting makes a blocking version request, so it happens off the event
+        # loop too; builds get their own client with BUILD_TIMEOUT_SECONDS
+        build_client = connect(settings.DOCKER_HOST)
+        try:
+            prepare_runner_images(build_client)
+        finally:
+            build_client.close()
+
+    # Workers take turns so only the first one builds; the rest find the images present
+    lock_timeout = BUILD_TIMEOUT_SECONDS * len(settings.LANG_IMAGE)
+    async with redis.lock("lock:runner-images", timeout=lock_timeout):
+        await asyncio.to_thread(build)
+
+
+async def _prepare_runner_images(redis):
+    """
+    Prepare the runner images, retrying with backoff until all of them are ready.
+    """
+    delay = 2
+    while True:
+        try:
+            await _prepare_runner_images_once(redis)
+        except Exception as e:
+            print(f"Could not prepare runner images, retrying in {delay}s: {e!r}")
+            mark_runner_images_unavailable(str(e))
+        else:
+            if all(status == "ready" for status in runner_images_status().values()):
+                return
+            print(f"Some runner images are not ready, retrying in {delay}s.")
+
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, STARTUP_RETRY_MAX_SECONDS)
+
+
+async def _ensure_indexes():
+    """
+    Create the submissions indexes, retrying with backoff until MongoDB is reachable.
+    """
+    delay = 2
+    while True:
+        try:
+            await ensure_indexes(await get_db())
+            return
+        except Exception as e:
+            print(f"Could not create MongoDB indexes, retrying in {delay}s: {e!r}")
+
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, STARTUP_RETRY_MAX_SECONDS)
+
+
+def _on_shutdown_signal(callback: Callable[[], None]):
+    """
+    Run `callback` on the event loop as soon as SIGINT or SIGTERM arrives, then
+    hand the signal to the server's own handler. Lifespan shutdown only starts
+    after the server has drained requests, which is too late to stop taking work.
+    """
+    # Signal handlers can only be installed from the main thread
+    if threading.current_thread() is not threading.main_thread():
+        return
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(sig)
+        if not callable(previous):
+            continue
+
+        def handler(signum, frame, previous=previous):
+            loop.call_soon_threadsafe(callback)
+            previous(signum, frame)
+
+        signal.signal(sig, handler)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    redis = await get_redis_client()
+
+    # Nothing slow runs before the server starts accepting connections: runner
+    # images and indexes are prepared in the background and /ready holds traffic
+    # back until the images are available
+    app.state.runner_images_task = asyncio.create_task(
+        _prepare_runner_images(redis), name="runner-images"
+    )
+    app.state.indexes_task = asyncio.create_task(_ensure_indexes(), name="indexes")
+    app.state.runner_images_task.add_done_callback(report_crash)
+    app.state.indexes_task.add_done_callback(report_crash)
+
+    loop = asyncio.get_running_loop()
+    stopping = asyncio.Event()
+    shutdown_deadline = None
+
+    def begin_shutdown():
+        # Request drain and job drain share one GRACEFUL_SHUTDOWN_SECONDS budget
+        nonlocal shutdown_deadline
+        if shutdown_deadline is None:
+            shutdown_deadline = loop.time() + settings.GRACEFUL_SHUTDOWN_SECONDS
+        stopping.set()
+
+    _on_shutdown_signal(begin_shutdown)
+    heartbeats = asyncio.create_task(send_heartbeats(redis), name="heartbeats")
+    consumer = asyncio.create_task(
+        consume_requeued_jobs(redis, run_requeued_task, stopping),
+        name="requeue-consumer",
+    )
+    heartbeats.add_done_callback(report_crash)
+    consumer.add_done_callback(report_crash)
+    yield
+
+    # The consumer stopped taking requeued jobs when the signal arrived and the
+    # server has drained in-flight requests since; give the jobs running here
+    # whatever is left of the budget. The heartbeat stays up until then so no
+    # other worker reclaims them meanwhile.
+    begin_shutdown()
+    # A crash was already reported by its done-callback, keep shutting down
+    await asyncio.gather(consumer, return_exceptions=True)
+    await drain_local_jobs(max(0.0, shutdown_deadline - loop.time()))
+    # Startup steps may still be retrying against an unreachable dependency
+    background = [heartbeats, app.state.runner_images_task, app.state.indexes_task]
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+    await redis.delete(HEARTBEAT_KEY.format(worker=worker_id()))
+
+
 def start_application() -> FastAPI:
-    app = FastAPI(title=settings.PROJECT_NAME, version=settings.PROJECT_VERSION)
+    app = FastAPI(
+        title=settings.PROJECT_NAME, version=settings.PROJECT_VERSION, lifespan=lifespan
+    )
     app.include_router(api_router)
 
     # Set all CORS enabled origins
@@ -26,3 +191,13 @@ app = start_application()
 @app.get("/", tags=["home"])
 def home():
     return {"message": "Welcome to the Own IDE API!"}
+
+
+@app.get("/ready", tags=["home"])
+def ready():
+    images = runner_images_status()
+    is_ready = all(status == "ready" for status in images.values())
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={"status": "ready" if is_ready else "starting", "images": images},
+    )
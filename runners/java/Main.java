@@ -0,0 +1,34 @@
+import java.io.BufferedReader;
+import java.io.InputStreamReader;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.util.*;
+import java.util.stream.Collectors;
+
+// Training program for the AppCDS archive: touches the classes typical
+// submissions load (readers, Scanner, collections, streams, formatting).
+public class Main {
+    public static void main(String[] args) throws Exception {
+        String content = Files.readString(Path.of("user_file.txt"));
+        Scanner scanner = new Scanner(content);
+        int n = scanner.nextInt();
+        List<Integer> values = new ArrayList<>();
+        for (int i = 0; i < n; i++) {
+            values.add(scanner.nextInt());
+        }
+
+        Map<Integer, Long> counts = values.stream()
+                .collect(Collectors.groupingBy(v -> v % 2, TreeMap::new, Collectors.counting()));
+        StringBuilder sb = new StringBuilder();
+        sb.append(String.format("sum=%d max=%d%n", values.stream().mapToInt(Integer::intValue).sum(),
+                Collections.max(values)));
+        sb.append(Arrays.toString(values.toArray())).append(' ').append(counts);
+
+        BufferedReader reader = new BufferedReader(new InputStreamReader(System.in));
+        String line;
+        while ((line = reader.readLine()) != null) {
+            sb.append('\n').append(line.trim());
+        }
+        System.out.println(sb);
+    }
+}
@@ -0,0 +1,9 @@
+#!/bin/sh
+# Run a command and append its in-container wall time to stderr as
+# "__OWNIDE_ELAPSED__ <seconds>", so reported times exclude docker exec overhead.
+start=$(cut -d' ' -f1 /proc/uptime)
+"$@"
+status=$?
+end=$(cut -d' ' -f1 /proc/uptime)
+printf '\n__OWNIDE_ELAPSED__ %s\n' "$(awk -v s="$start" -v e="$end" 'BEGIN { print e - s }')" >&2
+exit $status
@@ -1,11 +1,16 @@
+from datetime import datetime
 from pydantic import BaseModel
 from typing import Literal
 
+Language = Literal["python", "javascript", "java", "cpp"]
+SubmissionState = Literal["pending", "running", "completed", "failed", "timeout"]
+
 
 class CodeRequest(BaseModel):
-    language: Literal["python", "javascript", "java", "cpp"]
+    language: Language
     code: str
     input_data: str | None = None
+    profile: Literal["fast", "judge"] = "fast"
 
 
 class CodeResult(BaseModel):
@@ -13,11 +18,27 @@ class CodeResult(BaseModel):
     stderr: str | None = None
     error_type: Literal["runtime", "compile", "system"] | None = None
     exit_code: int | None = None
+    compile_time: float | None = None
     execution_time: float | None = None
 
 
 class CodeStatus(BaseModel):
     task_id: str
     user_id: str
-    status: Literal["pending", "running", "completed", "failed"]
+    status: SubmissionState
     result: CodeResult | None = None
+
+
+class SubmissionSummary(BaseModel):
+    task_id: str
+    language: Language
+    status: SubmissionState
+    created_at: datetime
+    # Bodies are only returned when explicitly requested
+    code: str | None = None
+    result: CodeResult | None = None
+
+
+class SubmissionHistory(BaseModel):
+    items: list[SubmissionSummary]
+    next_cursor: str | None = None